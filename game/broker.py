@@ -0,0 +1,338 @@
+import json
+import os
+import random
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+
+import requests
+
+# Shared socket path so every user on the host talks to the same broker.
+# Can be overridden with the GONKWARE_BROKER_SOCKET environment variable.
+BROKER_SOCKET = os.environ.get(
+    "GONKWARE_BROKER_SOCKET",
+    os.path.join(tempfile.gettempdir(), "gonkware_broker.sock"),
+)
+
+# Open Trivia DB allows one request every 5 seconds per IP
+API_RATE_LIMIT = 5.0
+# Largest batch the API will return in a single request
+FETCH_BATCH = 50
+# Refill a warm pool once it drops below this many questions
+LOW_WATER = 20
+# Longest a request waits for a cold pool to be fetched while the API is healthy
+SERVE_WAIT = 12.0
+# Clients wait a little longer than that, so a reply is never lost to a timeout
+CLIENT_TIMEOUT = SERVE_WAIT + 3.0
+# While the API is failing, check on it this often
+PROBE_INTERVAL = 30.0
+
+
+class RateLimiter:
+    """
+    Serializes API calls so they are spaced at least `interval` seconds apart.
+    """
+
+    def __init__(self, interval=API_RATE_LIMIT):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.last_call = 0.0
+
+    def wait(self):
+        """
+        Blocks until the next API call is allowed and reserves that slot.
+        """
+        with self.lock:
+            delay = self.last_call + self.interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.last_call = time.monotonic()
+
+
+class QuestionBroker:
+    """
+    Owns the Open Trivia DB session token, the rate limiter and a warm
+    pool of questions per (category, difficulty), shared by all clients.
+    All API calls are made by one background thread; requests are served
+    from the pools and only wait for a fetch when a pool is cold.
+    """
+
+    def __init__(self):
+        self.limiter = RateLimiter()
+        self.lock = threading.Lock()
+        self.ready = threading.Condition(self.lock)
+        self.pools = {}
+        self.wanted = set()
+        self.urgent = set()
+        self.categories = []
+        self.upstream_ok = True
+        self.token = self.request_token()
+        self.fetch_categories()
+
+    def request_token(self):
+        """
+        Requests a session token from the Open Trivia DB API.
+        Returns None on failure; the next fetch will ask for a new one.
+        """
+        self.limiter.wait()
+        try:
+            resp = requests.get("https://opentdb.com/api_token.php?command=request", timeout=10)
+            token = resp.json().get("token")
+        except Exception as e:
+            print(f"[!] Broker token request failed: {e}")
+            return None
+        print(f"[*] Broker received token: {token}")
+        return token
+
+    def reset_token(self):
+        """
+        Resets the session token once every question in it has been served.
+        """
+        self.limiter.wait()
+        try:
+            requests.get(f"https://opentdb.com/api_token.php?command=reset&token={self.token}", timeout=10)
+        except Exception as e:
+            print(f"[!] Broker token reset failed: {e}")
+            return
+        print("[*] Broker token exhausted, reset.")
+
+    def fetch_categories(self):
+        """
+        Fetches the category list so clients never have to ask the API themselves.
+        """
+        self.limiter.wait()
+        try:
+            data = requests.get("https://opentdb.com/api_category.php", timeout=10).json()
+        except Exception as e:
+            print(f"[!] Broker category fetch failed: {e}")
+            self.upstream_ok = False
+            return
+        self.upstream_ok = True
+        with self.lock:
+            self.categories = data.get("trivia_categories", []) or self.categories
+
+    def fetch(self, category, difficulty, amount):
+        """
+        Fetches a batch from the API into the pool for (category, difficulty).
+        Returns the number of questions added.
+        """
+        url = f"https://opentdb.com/api.php?amount={amount}&type=multiple&token={self.token}"
+        if category:
+            url += f"&category={category}"
+        if difficulty:
+            url += f"&difficulty={difficulty}"
+        self.limiter.wait()
+        try:
+            data = requests.get(url, timeout=10).json()
+        except Exception as e:
+            print(f"[!] Broker fetch failed: {e}")
+            with self.ready:
+                self.upstream_ok = False
+                self.ready.notify_all()
+            return 0
+        self.upstream_ok = True
+        code = data.get("response_code")
+        if code == 3 or self.token is None:  # Token not found, request a fresh one
+            self.token = self.request_token()
+        elif code == 4:  # Token has returned every question for this query
+            self.reset_token()
+        questions = data.get("results", [])
+        random.shuffle(questions)
+        with self.ready:
+            self.pools.setdefault((category, difficulty), []).extend(questions)
+            self.ready.notify_all()
+        return len(questions)
+
+    def get_questions(self, category, difficulty, amount):
+        """
+        Serves up to `amount` questions from the warm pool. A cold pool is
+        queued for the refill thread and waited on for at most SERVE_WAIT,
+        and not at all while the API is failing.
+        """
+        key = (category, difficulty)
+        deadline = time.monotonic() + SERVE_WAIT
+        with self.ready:
+            self.wanted.add(key)
+            if len(self.pools.get(key, [])) < amount:
+                self.urgent.add(key)
+                self.ready.notify_all()
+            while key in self.urgent and self.upstream_ok and len(self.pools.get(key, [])) < amount:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.ready.wait(remaining)
+            pool = self.pools.get(key, [])
+            served, self.pools[key] = pool[:amount], pool[amount:]
+        return served
+
+    def put_back(self, category, difficulty, questions):
+        """
+        Returns questions that could not be delivered to the front of their pool.
+        """
+        with self.lock:
+            key = (category, difficulty)
+            self.pools[key] = questions + self.pools.get(key, [])
+
+    def refill_forever(self, interval=1.0):
+        """
+        Background loop that makes every API call: cold pools clients are
+        waiting on first, then every requested pool below LOW_WATER.
+        Keys that stop returning questions are dropped until asked for again.
+        """
+        last_probe = 0.0
+        while True:
+            with self.ready:
+                if not self.urgent:
+                    self.ready.wait(interval)
+                keys = list(self.urgent)
+                if not keys and self.upstream_ok:
+                    keys = [key for key in self.wanted if len(self.pools.get(key, [])) < LOW_WATER]
+                need_categories = not self.categories
+            if not self.upstream_ok and not keys and time.monotonic() - last_probe >= PROBE_INTERVAL:
+                need_categories = True
+            if need_categories:
+                last_probe = time.monotonic()
+                self.fetch_categories()
+            for category, difficulty in keys:
+                # Smaller categories reject a full batch, so retry with a smaller one
+                added = self.fetch(category, difficulty, FETCH_BATCH)
+                if not added and self.upstream_ok:
+                    added = self.fetch(category, difficulty, 10)
+                with self.ready:
+                    # Only forget keys the API really has nothing for, not ones hit by an outage
+                    if not added and self.upstream_ok:
+                        self.wanted.discard((category, difficulty))
+                    self.urgent.discard((category, difficulty))
+                    self.ready.notify_all()
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    """
+    Handles one newline-delimited JSON request per connection.
+    """
+
+    def handle(self):
+        broker = self.server.broker
+        served = None
+        try:
+            request = json.loads(self.rfile.readline())
+            cmd = request.get("cmd")
+            if cmd == "ping":
+                reply = {"ok": True}
+            elif cmd == "categories":
+                reply = {"ok": True, "results": broker.categories}
+            elif cmd == "questions":
+                category = request.get("category")
+                difficulty = request.get("difficulty") or ""
+                served = broker.get_questions(category, difficulty, int(request.get("amount", 10)))
+                reply = {"ok": True, "results": served}
+            else:
+                reply = {"ok": False, "error": f"unknown command: {cmd}"}
+        except Exception as e:
+            reply = {"ok": False, "error": str(e)}
+        reply["upstream_ok"] = broker.upstream_ok
+        try:
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+        except OSError:
+            # Client gave up waiting; keep its questions for the next one
+            if served:
+                broker.put_back(category, difficulty, served)
+
+
+def serve(path=BROKER_SOCKET):
+    """
+    Runs the broker on a Unix domain socket until interrupted.
+    """
+    if os.path.exists(path):
+        if BrokerClient(path).ping():
+            print(f"[!] A broker is already running at {path}")
+            return
+        try:
+            os.unlink(path)  # Stale socket left by a dead broker
+        except PermissionError:
+            print(f"[!] {path} belongs to another user; set GONKWARE_BROKER_SOCKET to another path.")
+            return
+    broker = QuestionBroker()
+    server = socketserver.ThreadingUnixStreamServer(path, _BrokerHandler)
+    server.daemon_threads = True
+    server.broker = broker
+    os.chmod(path, 0o666)  # Let other users on the host connect
+    threading.Thread(target=broker.refill_forever, daemon=True).start()
+    print(f"[*] Question broker listening on {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[*] Broker shutting down.")
+    finally:
+        server.server_close()
+        os.unlink(path)
+
+
+class BrokerClient:
+    """
+    Thin client for the local question broker. Every call returns None
+    on failure so callers can fall back to fetching directly.
+    Also remembers whether the broker last reported OpenTDB as reachable.
+    """
+
+    def __init__(self, path=BROKER_SOCKET, timeout=CLIENT_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self.available = False
+        self.upstream_ok = True
+
+    def _call(self, payload, timeout=None):
+        if not hasattr(socket, "AF_UNIX") or not os.path.exists(self.path):
+            return None
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout or self.timeout)
+                sock.connect(self.path)
+                sock.sendall(json.dumps(payload).encode() + b"\n")
+                with sock.makefile("rb") as f:
+                    reply = json.loads(f.readline())
+        except (OSError, ValueError):
+            self.available = False
+            return None
+        self.upstream_ok = reply.get("upstream_ok", True)
+        return reply if reply.get("ok") else None
+
+    def ping(self):
+        """
+        Checks whether a broker is listening and remembers the result.
+        """
+        self.available = self._call({"cmd": "ping"}, timeout=0.5) is not None
+        return self.available
+
+    def get_categories(self):
+        """
+        Asks the broker for the category list. Returns a list, or None if the broker is unreachable.
+        """
+        reply = self._call({"cmd": "categories"})
+        return None if reply is None else reply.get("results", [])
+
+    def get_questions(self, category=None, amount=10, difficulty=""):
+        """
+        Asks the broker for questions. Returns a list, or None if the broker is unreachable.
+        """
+        reply = self._call({
+            "cmd": "questions",
+            "category": category,
+            "amount": amount,
+            "difficulty": difficulty,
+        })
+        return None if reply is None else reply.get("results", [])
+
+    def status_text(self):
+        """
+        Short human-readable state for the UI.
+        """
+        if not self.upstream_ok:
+            return "OpenTDB: unavailable (via broker) - using cached questions"
+        return "OpenTDB: online (via broker)"
+
+
+if __name__ == "__main__":
+    serve()
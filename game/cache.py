@@ -0,0 +1,91 @@
+import json
+import os
+import random
+import tempfile
+
+# Path for the last good categories and questions from Open Trivia DB
+CACHE_FILE = os.path.expanduser("~/.gonkware_cache.json")
+# Questions kept per category
+MAX_PER_CATEGORY = 200
+
+
+class ApiCache:
+    """
+    Keeps the last good categories and questions on disk so the game can
+    keep going when Open Trivia DB is unavailable.
+    """
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.categories = []
+        self.questions = {}
+        self.load()
+
+    def load(self):
+        """
+        Loads the cache from disk, starting empty if it is missing or unreadable.
+        """
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                    self.categories = data.get("categories", [])
+                    self.questions = data.get("questions", {})
+            except Exception as e:
+                print(f"[!] Could not read {self.path}, starting with an empty cache: {e}")
+                self.categories = []
+                self.questions = {}
+
+    def save(self):
+        """
+        Writes the cache to disk atomically, so a crash or a concurrent
+        writer never leaves a truncated file behind.
+        """
+        directory = os.path.dirname(self.path) or "."
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".gonkware_cache.")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump({"categories": self.categories, "questions": self.questions}, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"[!] Could not write {self.path}: {e}")
+
+    def store_categories(self, categories):
+        """
+        Replaces the cached category list with a freshly fetched one.
+        """
+        if categories:
+            self.categories = categories
+            self.save()
+
+    def store_questions(self, category, questions):
+        """
+        Adds freshly fetched questions for a category, keeping the newest ones.
+        """
+        if not questions:
+            return
+        key = str(category or "any")
+        known = {q["question"] for q in questions}
+        kept = [q for q in self.questions.get(key, []) if q["question"] not in known]
+        self.questions[key] = (kept + questions)[-MAX_PER_CATEGORY:]
+        self.save()
+
+    def get_questions(self, category=None, amount=10, difficulty=""):
+        """
+        Returns up to `amount` random cached questions for a category.
+        """
+        if category:
+            pool = self.questions.get(str(category), [])
+        else:
+            pool = [q for cached in self.questions.values() for q in cached]
+        if difficulty:
+            pool = [q for q in pool if q.get("difficulty") == difficulty]
+        return random.sample(pool, min(amount, len(pool)))
+
+
+# Shared cache for this process
+API_CACHE = ApiCache()
@@ -0,0 +1,162 @@
+import threading
+import time
+from collections import deque
+
+import requests
+
+CLOSED = "closed"
+OPEN = "open"
+
+# Rolling window of recent calls used for error rate and latency percentiles
+WINDOW = 20
+MIN_SAMPLES = 4
+# Trip when this share of recent calls failed...
+ERROR_RATE = 0.5
+# ...or when the 95th percentile latency is above this many seconds
+SLOW_P95 = 2.0
+# Consecutive failures that trip the circuit before MIN_SAMPLES is reached
+MAX_CONSECUTIVE_FAILURES = 2
+# Request timeout bounds; the actual timeout follows observed latency
+MIN_TIMEOUT = 1.0
+MAX_TIMEOUT = 4.0
+# Rate-limited replies (HTTP 429 / response_code 5) mean a healthy API, not an outage
+RATE_LIMITED = 5
+# Open Trivia DB allows one request every 5 seconds per IP
+API_RATE_LIMIT = 5.0
+# Seconds between background recovery probes (doubles up to the max)
+PROBE_INTERVAL = 5.0
+MAX_PROBE_INTERVAL = 60.0
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling the API while the circuit is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Guards calls to a remote API. Tracks error rate and latency over recent
+    calls and opens the circuit when the API is failing or slow, so callers
+    fail fast to cached data while a background probe waits for recovery.
+    """
+
+    def __init__(self, probe_url):
+        self.probe_url = probe_url
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.calls = deque(maxlen=WINDOW)
+        self.consecutive_failures = 0
+        self.last_call = 0.0
+
+    def wait_time(self):
+        """
+        Seconds until the API's rate limit allows the next call.
+        """
+        return max(0.0, self.last_call + API_RATE_LIMIT - time.monotonic())
+
+    def percentile(self, pct):
+        """
+        Returns the given latency percentile (seconds) of recent successful calls, or None.
+        """
+        with self.lock:
+            latencies = sorted(latency for ok, latency in self.calls if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * pct / 100))]
+
+    def timeout(self):
+        """
+        Request timeout hedged on observed latency: a few times the p95, within bounds.
+        """
+        p95 = self.percentile(95)
+        if p95 is None:
+            return MAX_TIMEOUT
+        return max(MIN_TIMEOUT, min(MAX_TIMEOUT, p95 * 3))
+
+    def get_json(self, url):
+        """
+        GETs a URL and decodes its JSON body through the breaker.
+        Never sleeps: callers space calls using wait_time(). A rate-limited
+        reply is returned at once with response_code 5 for the caller to handle.
+        Raises CircuitOpenError when the circuit is open or the call fails.
+        """
+        if self.state == OPEN:
+            raise CircuitOpenError(url)
+        start = self.last_call = time.monotonic()
+        try:
+            resp = requests.get(url, timeout=self.timeout())
+            if resp.status_code == 429:
+                data = {"response_code": RATE_LIMITED, "results": []}
+            else:
+                resp.raise_for_status()
+                data = resp.json()
+        except (requests.RequestException, ValueError) as e:
+            self.record(False, time.monotonic() - start)
+            raise CircuitOpenError(url) from e
+        self.record(True, time.monotonic() - start)
+        return data
+
+    def record(self, ok, latency):
+        """
+        Records the outcome of one call and trips the circuit if needed.
+        """
+        with self.lock:
+            self.calls.append((ok, latency))
+            self.consecutive_failures = 0 if ok else self.consecutive_failures + 1
+            failures = sum(1 for success, _ in self.calls if not success)
+            trip = self.consecutive_failures >= MAX_CONSECUTIVE_FAILURES or (
+                len(self.calls) >= MIN_SAMPLES and failures / len(self.calls) >= ERROR_RATE
+            )
+        if not trip:
+            p95 = self.percentile(95)
+            trip = len(self.calls) >= MIN_SAMPLES and p95 is not None and p95 > SLOW_P95
+        if trip:
+            self.trip()
+
+    def trip(self):
+        """
+        Opens the circuit and starts a background probe for recovery.
+        """
+        with self.lock:
+            if self.state == OPEN:
+                return
+            self.state = OPEN
+        threading.Thread(target=self._probe, daemon=True).start()
+
+    def _probe(self):
+        interval = PROBE_INTERVAL
+        while True:
+            time.sleep(interval)
+            start = self.last_call = time.monotonic()
+            try:
+                resp = requests.get(self.probe_url, timeout=MIN_TIMEOUT * 2)
+                if resp.status_code != 429:  # Rate limited still means the API is up
+                    resp.raise_for_status()
+            except requests.RequestException:
+                interval = min(interval * 2, MAX_PROBE_INTERVAL)
+                continue
+            with self.lock:
+                # Start over with a clean window seeded by the successful probe
+                self.calls.clear()
+                self.calls.append((True, time.monotonic() - start))
+                self.consecutive_failures = 0
+                self.state = CLOSED
+            return
+
+    def status_text(self):
+        """
+        Short human-readable state for the UI.
+        """
+        if self.state == OPEN:
+            return "OpenTDB: unavailable - using cached questions"
+        if not self.calls:
+            return "OpenTDB: unknown"
+        p50 = self.percentile(50)
+        if p50 is None:
+            return "OpenTDB: online"
+        return f"OpenTDB: online ({int(p50 * 1000)} ms)"
+
+
+# Shared breaker for every call to Open Trivia DB in this process
+OPENTDB = CircuitBreaker("https://opentdb.com/api_category.php")
@@ -0,0 +1,163 @@
+import html
+import json
+import os
+import random
+import re
+import zlib
+
+# Path for the sketches of every question seen, so repeats are caught across runs
+SEEN_FILE = os.path.expanduser("~/.gonkware_seen.jsonl")
+
+# MinHash signature length, split into LSH bands of BAND_ROWS rows each.
+# Wide bands keep buckets small even when questions share common words.
+NUM_PERMS = 128
+BAND_ROWS = 4
+# Minimum shingle Jaccard similarity for two questions to count as duplicates
+SIMILARITY = 0.5
+# Newest entries verified per band, keeps inserts sub-linear in busy buckets
+MAX_PER_BAND = 8
+
+_PRIME = (1 << 61) - 1
+_WORD_RE = re.compile(r"\w+")
+# Filler words that would otherwise make unrelated questions share buckets
+_STOPWORDS = frozenset(
+    "a an and are as at by did do does for from has have in is it its of on or "
+    "the this to was were what which who whom whose why when where how".split()
+)
+
+
+def normalize(text):
+    """
+    Unescapes HTML entities, case-folds and reduces text to plain words.
+    One-letter fragments such as the "s" in "what's" are dropped.
+    """
+    return " ".join(w for w in _WORD_RE.findall(html.unescape(text).casefold()) if len(w) > 1)
+
+
+def shingles(text):
+    """
+    Returns the set of content-word shingles of normalized text, minus filler words.
+    """
+    words = [w for w in text.split() if w not in _STOPWORDS] or text.split()
+    return frozenset(words)
+
+
+class QuestionDeduper:
+    """
+    Drops questions that repeat or closely reword one already seen.
+    Uses MinHash sketches with LSH banding so each insert only compares
+    against a handful of bucket-mates instead of the whole corpus.
+    If given a path, questions marked as seen are appended there and
+    reloaded next time, so duplicates are caught across runs.
+    """
+
+    def __init__(self, path=None, similarity=SIMILARITY, num_perms=NUM_PERMS, band_rows=BAND_ROWS, seed=0):
+        self.path = path
+        self.similarity = similarity
+        self.band_rows = band_rows
+        rng = random.Random(seed)
+        self.perms = [(rng.randrange(1, _PRIME), rng.randrange(_PRIME)) for _ in range(num_perms)]
+        self.exact = set()
+        self.buckets = {}
+        self.entries = []
+        self.unsaved = {}
+        self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def signature(self, shingle_set):
+        """
+        Computes the MinHash signature of a shingle set.
+        """
+        hashes = [zlib.crc32(s.encode()) for s in shingle_set]
+        return [min((a * h + b) % _PRIME for h in hashes) for a, b in self.perms]
+
+    def band_keys(self, sig):
+        """
+        Hashes each band of a signature into a compact, stable bucket key.
+        """
+        return [
+            zlib.crc32(str(sig[i:i + self.band_rows]).encode())
+            for i in range(0, len(sig), self.band_rows)
+        ]
+
+    def _insert(self, text, answer, bands):
+        idx = len(self.entries)
+        self.entries.append((answer, shingles(text)))
+        for band, key in enumerate(bands):
+            self.buckets.setdefault((band, key), []).append(idx)
+
+    def load(self):
+        """
+        Loads previously seen questions from disk, skipping unreadable lines.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    try:
+                        text, answer, bands = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.exact.add((text, answer))
+                    if bands:
+                        self._insert(text, answer, bands)
+        except OSError as e:
+            print(f"[!] Could not read {self.path}: {e}")
+
+    def mark_seen(self, question):
+        """
+        Persists a question that was actually shown, so later runs skip it.
+        Questions that were loaded but never reached are not saved.
+        """
+        key = (normalize(question["question"]), normalize(question.get("correct_answer", "")))
+        record = self.unsaved.pop(key, None)
+        if not self.path or record is None:
+            return
+        try:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"[!] Could not write {self.path}: {e}")
+
+    def add(self, question):
+        """
+        Records a question for this run. Returns False if it duplicates one already seen.
+        """
+        text = normalize(question["question"])
+        answer = normalize(question.get("correct_answer", ""))
+        if (text, answer) in self.exact:
+            return False
+        shingle_set = shingles(text)
+        if not shingle_set:
+            self.exact.add((text, answer))
+            self.unsaved[(text, answer)] = [text, answer, []]
+            return True
+        bands = self.band_keys(self.signature(shingle_set))
+
+        # Verify LSH candidates with exact Jaccard; a different answer means a different question.
+        # Each band checks only its newest few entries, so one busy bucket can't starve the rest.
+        checked = set()
+        for band, key in enumerate(bands):
+            for idx in reversed(self.buckets.get((band, key), [])[-MAX_PER_BAND:]):
+                if idx in checked:
+                    continue
+                checked.add(idx)
+                other_answer, other_shingles = self.entries[idx]
+                if other_answer == answer:
+                    overlap = len(shingle_set & other_shingles)
+                    if overlap / (len(shingle_set) + len(other_shingles) - overlap) >= self.similarity:
+                        return False
+
+        self.exact.add((text, answer))
+        self._insert(text, answer, bands)
+        self.unsaved[(text, answer)] = [text, answer, bands]
+        return True
+
+    def filter(self, questions):
+        """
+        Returns only the questions not already seen, remembering them for this run.
+        """
+        return [q for q in questions if self.add(q)]
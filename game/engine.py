@@ -1,7 +1,14 @@
-import requests
 import random
 import time
 
+from game.broker import BrokerClient
+from game.cache import API_CACHE
+from game.circuit import OPEN, OPENTDB, RATE_LIMITED, CircuitOpenError
+from game.dedupe import SEEN_FILE, QuestionDeduper
+
+# Top a batch up with repeats when fewer than this many fresh questions remain
+MIN_QUESTIONS = 10
+
 
 class GameEngine:
     """
@@ -15,16 +22,28 @@ class GameEngine:
         self.score = 0
         self.lives = 5
         self.categories = categories or []
-        self.token = self.get_token()
+        # Remembers every question served, across runs, so rewordings across tokens are dropped
+        self.deduper = QuestionDeduper(SEEN_FILE)
+        # Prefer a local question broker; only take our own token without one
+        self.broker = BrokerClient()
+        if self.broker.ping():
+            print(f"[*] Using question broker at {self.broker.path}")
+            self.token = None
+        else:
+            self.token = self.get_token()
 
     def get_token(self):
         """
         Requests a session token from the Open Trivia DB API.
         Ensures unique questions for each session.
+        Returns None if the API is unavailable.
         """
         print("[*] Requesting session token...")
-        resp = requests.get("https://opentdb.com/api_token.php?command=request")
-        data = resp.json()
+        try:
+            data = OPENTDB.get_json("https://opentdb.com/api_token.php?command=request")
+        except CircuitOpenError:
+            print("[!] Open Trivia DB unavailable, continuing without a token.")
+            return None
         token = data.get("token")
         print(f"[*] Received token: {token}")
         return token
@@ -38,28 +57,105 @@ class GameEngine:
         self.current_index = 0
         self.fetch_questions()
 
+    @property
+    def using_broker(self):
+        """
+        True while questions are being served by the local broker.
+        """
+        return self.broker.available
+
+    @property
+    def api_unavailable(self):
+        """
+        True while questions come from the cache because Open Trivia DB is down,
+        as reported by the broker when one is in use.
+        """
+        if self.using_broker:
+            return not self.broker.upstream_ok
+        return OPENTDB.state == OPEN
+
+    def api_status(self):
+        """
+        Short human-readable Open Trivia DB state for the UI.
+        """
+        if self.using_broker:
+            return self.broker.status_text()
+        return OPENTDB.status_text()
+
+    def rate_limit_delay(self):
+        """
+        Seconds to wait before the next direct Open Trivia DB call is allowed.
+        """
+        if self.using_broker or self.api_unavailable:
+            return 0.0
+        return OPENTDB.wait_time()
+
+    def fetch_category_questions(self, category=None, amount=10, difficulty=""):
+        """
+        Fetches questions for one category (any category if None).
+        Asks the local broker first and falls back to Open Trivia DB directly.
+        While OpenTDB is slow, failing or rate limiting us, serves the last good cached questions instead.
+        """
+        if self.broker.available:
+            questions = self.broker.get_questions(category, amount, difficulty)
+            if questions:
+                API_CACHE.store_questions(category, questions)
+                return questions
+            if self.broker.available:
+                # The broker had nothing, e.g. OpenTDB behind it is down
+                return API_CACHE.get_questions(category, amount, difficulty)
+            print("[!] Question broker unreachable, fetching directly.")
+        if self.token is None and not self.api_unavailable:
+            time.sleep(self.rate_limit_delay())
+            self.token = self.get_token()
+        url = f"https://opentdb.com/api.php?amount={amount}&type=multiple&token={self.token}"
+        if category:
+            url += f"&category={category}"
+        if difficulty:
+            url += f"&difficulty={difficulty}"
+        time.sleep(self.rate_limit_delay())  # Respect API rate limit
+        try:
+            data = OPENTDB.get_json(url)
+        except CircuitOpenError:
+            return API_CACHE.get_questions(category, amount, difficulty)
+        code = data.get("response_code")
+        if code in (3, 4):  # Token missing or exhausted, take a fresh one next time
+            self.token = None
+        if code in (3, 4, RATE_LIMITED):
+            return API_CACHE.get_questions(category, amount, difficulty)
+        questions = data.get("results", [])
+        API_CACHE.store_questions(category, questions)
+        return questions
+
     def fetch_questions(self, amount=10):
         """
         Fetches questions from Open Trivia DB for each selected category.
-        Respects API rate limits (5 seconds between requests).
+        Rate limits are respected by fetch_category_questions.
         Shuffles all questions before starting the game.
         """
         all_questions = []
         if self.categories:
             for cat in self.categories:
-                url = f"https://opentdb.com/api.php?amount={amount}&type=multiple&category={cat}&token={self.token}"
-                response = requests.get(url)
-                data = response.json()
-                questions = data.get("results", [])
-                all_questions.extend(questions)
-                time.sleep(5)  # Respect API rate limit
+                all_questions.extend(self.fetch_category_questions(cat, amount))
         else:
-            url = f"https://opentdb.com/api.php?amount={amount}&type=multiple&token={self.token}"
-            response = requests.get(url)
-            data = response.json()
-            all_questions = data.get("results", [])
-        random.shuffle(all_questions)
-        self.questions = all_questions
+            all_questions = self.fetch_category_questions(amount=amount)
+        self.load_questions(all_questions)
+
+    def load_questions(self, questions):
+        """
+        Ingests fetched questions: drops near-duplicates of anything seen before,
+        shuffles the rest and starts from the first one.
+        If too few fresh questions remain, repeats are appended after them
+        rather than shrinking the game to a handful of questions.
+        """
+        unique = self.deduper.filter(questions)
+        random.shuffle(unique)
+        if len(unique) < MIN_QUESTIONS:
+            fresh = {id(q) for q in unique}
+            repeats = [q for q in questions if id(q) not in fresh]
+            random.shuffle(repeats)
+            unique += repeats[:MIN_QUESTIONS - len(unique)]
+        self.questions = unique
         self.current_index = 0
 
     def update(self):
@@ -104,6 +200,8 @@ class GameEngine:
         """
         if self.lives <= 0 or self.current_index >= len(self.questions):
             return
+        # Only questions the player actually got to are remembered across runs
+        self.deduper.mark_seen(self.questions[self.current_index])
         if user_input is None:
             self.lives -= 1
         else:
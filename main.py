@@ -20,14 +20,22 @@ def main():
 
     # Show the animated loading screen and fetch questions
     tui.display_loading_and_fetch(game_engine)
+    if not game_engine.questions:
+        # OpenTDB unreachable and nothing cached to fall back on
+        print("[!] No questions available. Check your connection and try again.")
+        return
 
     # Main game loop
     while True:
         # Get the current game state (question, score, lives, etc.)
         game_state = game_engine.get_game_state()
 
-        # If questions are still loading, skip rendering and wait
+        # If out of questions, fetch more; stop if none can be fetched or cached
         if game_state.get("loading"):
+            game_engine.update()
+            if game_engine.get_game_state().get("loading"):
+                print("[!] No more questions available. Check your connection and try again.")
+                break
             continue
 
         print("[*] Rendering game state...")
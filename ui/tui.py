@@ -2,10 +2,13 @@ import curses
 import random
 import html
 import time
-import requests
 import json
 import os
 
+from game.broker import BrokerClient
+from game.cache import API_CACHE
+from game.circuit import OPEN, OPENTDB, CircuitOpenError
+
 # ASCII art logo for the main menu
 GONKWARE_ART = [
     " ██████╗  ██████╗ ███╗   ██╗██╗  ██╗██╗    ██╗ █████╗ ██████╗ ███████╗",
@@ -19,38 +22,44 @@ GONKWARE_ART = [
 # Path for saving user preferences
 PREFS_FILE = os.path.expanduser("~/.gonkware_prefs.json")
 
-def fetch_categories():
+def fetch_categories(broker=None):
     """
-    Fetches trivia categories from the Open Trivia DB API.
-    Returns a list of category dictionaries.
+    Fetches trivia categories from the local broker if one is running,
+    otherwise from the Open Trivia DB API.
+    Returns a list of category dictionaries, falling back to the last
+    good cached list while the API is unavailable.
     """
+    if broker is not None and broker.available:
+        categories = broker.get_categories()
+        if categories:
+            API_CACHE.store_categories(categories)
+            return categories
+        if broker.available:
+            # Leave the shared rate limit to the broker
+            return API_CACHE.categories
     url = "https://opentdb.com/api_category.php"
+    time.sleep(OPENTDB.wait_time())  # Respect API rate limit
     try:
-        resp = requests.get(url, timeout=5)
-        data = resp.json()
-        return data.get("trivia_categories", [])
-    except Exception:
-        return []
-
-def fetch_categories_with_progress(stdscr=None):
+        data = OPENTDB.get_json(url)
+    except CircuitOpenError:
+        return API_CACHE.categories
+    categories = data.get("trivia_categories", [])
+    API_CACHE.store_categories(categories)
+    return categories or API_CACHE.categories
+
+def fetch_categories_with_progress(stdscr=None, broker=None):
     """
     Fetches trivia categories from the Open Trivia DB API.
     If stdscr is provided, shows a loading bar.
     """
-    url = "https://opentdb.com/api_category.php"
-    try:
-        if stdscr:
-            stdscr.clear()
-            stdscr.border(0)
-            msg = "Loading categories from Open Trivia DB..."
-            max_y, max_x = stdscr.getmaxyx()
-            stdscr.addstr(max_y // 2 - 1, max_x // 2 - len(msg) // 2, msg, curses.A_BOLD)
-            stdscr.refresh()
-        resp = requests.get(url, timeout=5)
-        data = resp.json()
-        return data.get("trivia_categories", [])
-    except Exception:
-        return []
+    if stdscr:
+        stdscr.clear()
+        stdscr.border(0)
+        msg = "Loading categories from Open Trivia DB..."
+        max_y, max_x = stdscr.getmaxyx()
+        stdscr.addstr(max_y // 2 - 1, max_x // 2 - len(msg) // 2, msg, curses.A_BOLD)
+        stdscr.refresh()
+    return fetch_categories(broker)
 
 class TUI:
     """
@@ -64,6 +73,9 @@ class TUI:
         # Map display names to API values
         self.difficulty_api_map = {"Any": "", "Easy": "easy", "Medium": "medium", "Hard": "hard"}
         self.difficulty = "Any" # Default difficulty
+        # Shared question broker, if one is running on this host
+        self.broker = BrokerClient()
+        self.broker.ping()
         self.load_preferences()
 
     def load_preferences(self):
@@ -97,6 +109,14 @@ class TUI:
         except Exception:
             pass
 
+    def _api_status(self):
+        """
+        Returns the Open Trivia DB status line and whether the API is down.
+        """
+        if self.broker.available:
+            return self.broker.status_text(), not self.broker.upstream_ok
+        return OPENTDB.status_text(), OPENTDB.state == OPEN
+
     def _init_colors(self):
         """
         Initializes color pairs for TUI, For colorizing.
@@ -162,6 +182,11 @@ class TUI:
                 attr = curses.color_pair(3) | curses.A_BOLD if i == idx else curses.color_pair(4)
                 stdscr.addstr(y, x, item, attr)
 
+            # OpenTDB circuit breaker state
+            status, api_down = self._api_status()
+            status_attr = curses.color_pair(5) if api_down else curses.color_pair(4) | curses.A_DIM
+            stdscr.addstr(max_y - 2, max_x // 2 - len(status) // 2, status, status_attr)
+
             stdscr.refresh()
             key = stdscr.getch()
             if key in [curses.KEY_UP, ord('k')]:
@@ -190,7 +215,18 @@ class TUI:
         max_y, max_x = stdscr.getmaxyx()
 
         # Show loading screen while fetching categories
-        categories = fetch_categories_with_progress(stdscr)
+        categories = fetch_categories_with_progress(stdscr, self.broker)
+        if not categories:
+            # First run with Open Trivia DB down: nothing to choose from
+            msg = "Categories unavailable: Open Trivia DB is unreachable and nothing is cached."
+            stdscr.clear()
+            stdscr.border(0)
+            stdscr.addstr(max_y // 2 - 1, max(1, max_x // 2 - len(msg) // 2), msg[:max_x - 2], curses.color_pair(5) | curses.A_BOLD)
+            stdscr.addstr(max_y // 2 + 1, max_x // 2 - 14, "Press any key to return.", curses.A_DIM)
+            stdscr.refresh()
+            stdscr.getch()
+            stdscr.clear()
+            return
         menu_items = [cat["name"] for cat in categories]
         category_ids = [cat["id"] for cat in categories]
         category_idx = 0
@@ -285,7 +321,7 @@ class TUI:
                     focus_on_difficulty = True
                     changed = True
             elif key == ord(' '):
-                if not focus_on_difficulty:
+                if not focus_on_difficulty and category_ids:
                     cat_id = category_ids[category_idx]
                     if cat_id in self.selected_categories:
                         self.selected_categories.remove(cat_id)
@@ -486,7 +522,8 @@ class TUI:
             time.sleep(0.15)
 
         # Fetch questions per category with progress and fallback logic
-        category_map = {str(cat['id']): cat['name'] for cat in fetch_categories()}
+        # Names only, so prefer the cache over spending a rate-limited API call
+        category_map = {str(cat['id']): cat['name'] for cat in API_CACHE.categories or fetch_categories(engine.broker)}
         zero_q_cats = []
         for idx, cat in enumerate(categories):
             cat_name = category_map.get(str(cat), f"Category {cat}")
@@ -500,28 +537,28 @@ class TUI:
                 time.sleep(0.05)
             stdscr.addstr(y, x_left + len(msg) + 2, " ", curses.color_pair(4))
 
+            def fetch(amount, difficulty=""):
+                # Show the wait for the API rate limit rather than stalling silently
+                delay = engine.rate_limit_delay()
+                if delay > 0:
+                    rate_msg = f"[gonkware] Waiting {delay:.0f}s to avoid API rate limiting..."
+                    stdscr.addstr(y + 1, x_left, rate_msg, curses.color_pair(5))
+                    stdscr.refresh()
+                    time.sleep(delay)
+                    stdscr.addstr(y + 1, x_left, " " * len(rate_msg), curses.color_pair(5))
+                return engine.fetch_category_questions(cat, amount, difficulty)
+
             # 1. Try with selected difficulty
             difficulty_param = self.difficulty_api_map.get(self.difficulty, "")
-            url = f"https://opentdb.com/api.php?amount=10&type=multiple&category={cat}&token={engine.token}"
-            if difficulty_param:
-                url += f"&difficulty={difficulty_param}"
-            response = requests.get(url)
-            data = response.json()
-            questions = data.get("results", [])
+            questions = fetch(10, difficulty_param)
 
             # 2. If zero, try with "Any" difficulty
             if not questions and difficulty_param:
-                url_any = f"https://opentdb.com/api.php?amount=10&type=multiple&category={cat}&token={engine.token}"
-                response = requests.get(url_any)
-                data = response.json()
-                questions = data.get("results", [])
+                questions = fetch(10)
 
             # 3. If still zero, try with 5 questions
             if not questions:
-                url_five = f"https://opentdb.com/api.php?amount=5&type=multiple&category={cat}&token={engine.token}"
-                response = requests.get(url_five)
-                data = response.json()
-                questions = data.get("results", [])
+                questions = fetch(5)
 
             # 4. If still zero, warn but include category
             if not questions:
@@ -530,22 +567,27 @@ class TUI:
             else:
                 all_questions.extend(questions)
                 stdscr.addstr(y, x_left + len(msg) + 5, f"[{len(questions)} loaded]", curses.color_pair(2))
+            if engine.api_unavailable:
+                stdscr.addstr(y, x_left + len(msg) + 18, "(cached)", curses.color_pair(5))
             stdscr.refresh()
             time.sleep(0.1)
-            if idx < total - 1:
-                rate_msg = "[gonkware] Waiting 2s to avoid API rate limiting..."
-                stdscr.addstr(y + 1, x_left, rate_msg, curses.color_pair(5))
-                stdscr.refresh()
-                time.sleep(2)
-                stdscr.addstr(y + 1, x_left, " " * len(rate_msg), curses.color_pair(5))
-        random.shuffle(all_questions)
-        engine.questions = all_questions
-        engine.current_index = 0
+        engine.load_questions(all_questions)
         y = y_start + len(messages) + total + 2
         if zero_q_cats:
             warn = "Warning: No questions for: " + ", ".join(zero_q_cats)
             stdscr.addstr(y, x_left, warn[:max_x-4], curses.color_pair(5) | curses.A_BOLD)
             y += 2
+        if engine.api_unavailable:
+            stdscr.addstr(y, x_left, "[gonkware] " + engine.api_status(), curses.color_pair(5) | curses.A_BOLD)
+            y += 2
+        if not engine.questions:
+            # Nothing fetched and nothing cached, the game cannot start
+            err = "[gonkware] No questions available: Open Trivia DB is unreachable and nothing is cached."
+            stdscr.addstr(y, x_left, err[:max_x-4], curses.color_pair(5) | curses.A_BOLD)
+            stdscr.addstr(y + 2, x_left, "Press any key to exit.", curses.A_DIM)
+            stdscr.refresh()
+            stdscr.getch()
+            return
         final_msg = "[gonkware] Trivia engine ready."
         stdscr.addstr(y, x_left, final_msg, curses.color_pair(4) | curses.A_BOLD)
         stdscr.refresh()